@@ -1,20 +1,99 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+# Greenlet-based concurrency for Socket.IO; eventlet has to patch the
+# stdlib before anything else imports socket/threading
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    ASYNC_MODE = 'eventlet'
+except ImportError:
+    ASYNC_MODE = 'threading'
+
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session, jsonify
+from flask_socketio import SocketIO, join_room, leave_room
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import json
-from datetime import datetime
+import copy
+import math
+import mmap
+import queue
+import hashlib
+import secrets
+import atexit
+import logging
+import logging.handlers
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+# orjson is much faster than stdlib json; fall back if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Log records are handed to a queue and written out by a listener thread,
+# so a request that logs never blocks on the output stream
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-123')
+app.json.compact = True
+app.permanent_session_lifetime = timedelta(hours=8)
+# Don't re-sign and resend the session cookie on every polled request
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+# Compiled templates are kept on disk across restarts/worker cycles and not
+# re-checked against their source on every render. With no directory given,
+# Jinja uses a per-user temp dir it creates 0700 and checks the owner of,
+# so other local users can't plant cache files.
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+# Heroku/Render put one router in front of the app; trust that many
+# X-Forwarded-For hops so request.remote_addr is the real client
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ.get('PROXY_HOPS', '1')))
+
+class _OrjsonCodec:
+    """json-module lookalike so Socket.IO packets are encoded with orjson"""
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+socketio = SocketIO(app, async_mode=ASYNC_MODE, json=_OrjsonCodec if orjson else json)
+
+# Data and config files live next to this file, wherever the process was
+# started from (wsgi.py runs from the repo root)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    from storage import atomic_write
+except ImportError:
+    # Imported as web_app.app by wsgi.py
+    from web_app.storage import atomic_write
 
 # Try to import modules
 try:
-    from auth import UserManager
-    from email_notifier import EmailNotifier
+    try:
+        from auth import UserManager
+        from email_notifier import EmailNotifier
+    except ImportError:
+        # Imported as web_app.app by wsgi.py
+        from web_app.auth import UserManager
+        from web_app.email_notifier import EmailNotifier
     
-    user_manager = UserManager('users.json')
-    email_notifier = EmailNotifier('email_config.json')
+    user_manager = UserManager(os.path.join(APP_DIR, 'users.json'))
+    email_notifier = EmailNotifier(os.path.join(APP_DIR, 'email_config.json'))
 except ImportError as e:
-    print(f"Warning: Could not import modules: {e}")
+    app.logger.warning("Could not import modules: %s", e)
     # Create dummy classes
     class UserManager:
         def __init__(self, *args): pass
@@ -24,35 +103,309 @@ except ImportError as e:
     class EmailNotifier:
         def __init__(self, *args): pass
         def send_inventory_change_email(self, *args): return True
+        def send_inventory_change_email_async(self, *args): return True
     
     user_manager = UserManager()
     email_notifier = EmailNotifier()
 
+DATA_DIR = os.path.join(APP_DIR, 'data')
+SHARED_DIR = os.path.join(os.path.dirname(APP_DIR), 'shared')
+# Created once here rather than on every write
+os.makedirs(DATA_DIR, exist_ok=True)
+
+INVENTORY_FILE = os.path.join(DATA_DIR, 'inventory.json')
+MESSAGES_FILE = os.path.join(DATA_DIR, 'messages.json')
+# Copies shared with the Kivy desktop app, preferred when they exist
+SHARED_INVENTORY_FILE = os.path.join(SHARED_DIR, 'inventory.json')
+SHARED_MESSAGES_FILE = os.path.join(SHARED_DIR, 'messages.json')
+
+# Parsed inventory, only re-read from disk when the file's mtime changes.
+# 'by_id' maps str(item id) -> position in data['items'] and 'encoded' is
+# the (json bytes, etag) pair served by GET /api/inventory. 'dirty' is set
+# while the cached data is newer than what the background writer has saved.
+_INV_CACHE = {'mtime': 0, 'data': None, 'by_id': {}, 'encoded': None,
+              'dirty': False, 'lock': threading.Lock()}
+_write_lock = threading.Lock()
+# Serializes load -> modify -> save in the mutating handlers
+_mutation_lock = threading.Lock()
+
 # Helper functions
-def load_inventory():
-    try:
-        if os.path.exists('data/inventory.json'):
-            with open('data/inventory.json', 'r') as f:
-                return json.load(f)
-    except Exception:
-        pass
-    return {"items": []}
-
-def save_inventory(data):
-    try:
-        os.makedirs('data', exist_ok=True)
-        with open('data/inventory.json', 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception:
+# Files above this size are parsed straight from a memory map
+MMAP_THRESHOLD = 1024 * 1024
+
+def read_json(path):
+    with open(path, 'rb') as f:
+        if orjson and os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+# Other JSON files (messages) by path, as (mtime_ns, parsed data)
+_json_cache = {}
+
+def load_json(path):
+    """Parsed contents of path, only re-read when its mtime changes. Shared, don't mutate"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    data = read_json(path)
+    _json_cache[path] = (mtime, data)
+    return data
+
+def _write_json_file(path, data, body):
+    atomic_write(path, body)
+    _json_cache[path] = (os.stat(path).st_mtime_ns, data)
+
+def _encode_file(data):
+    # Compact: these files are only read by programs, and are rewritten often
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def _stat_inventory():
+    """Return (path, stat) of the inventory file, or (None, None) if there is none"""
+    # The shared copy is checked first every time: the writer or the Kivy app
+    # may have created it since the last call, and it then has to win
+    for path in (SHARED_INVENTORY_FILE, INVENTORY_FILE):
+        try:
+            return path, os.stat(path)
+        except FileNotFoundError:
+            continue
+    return None, None
+
+def _index_items(data):
+    return {str(item.get('id')): pos for pos, item in enumerate(data.get('items', []))}
+
+def _set_cached_inventory(data):
+    # Caller must hold _INV_CACHE['lock']. Everything is derived first so a
+    # failure leaves the previous cache whole instead of half replaced.
+    by_id = _index_items(data)
+    body = orjson.dumps(data) if orjson else json.dumps(data).encode()
+    encoded = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+    _INV_CACHE.update(data=data, by_id=by_id, encoded=encoded)
+
+def _refresh_inventory_cache():
+    """Re-parse the inventory file if it changed, returns False if it can't be read"""
+    if _INV_CACHE['dirty']:
+        return True  # the file is behind the cache until the writer catches up
+    path, st = _stat_inventory()
+    if path is None:
         return False
+    
+    mtime = st.st_mtime_ns
+    if mtime != _INV_CACHE['mtime']:
+        with _INV_CACHE['lock']:
+            if mtime != _INV_CACHE['mtime']:
+                try:
+                    _set_cached_inventory(read_json(path))
+                    _INV_CACHE['mtime'] = mtime
+                except Exception:
+                    return False
+    return True
+
+def load_inventory(readonly=False):
+    """Current inventory; pass readonly=True to get the shared cached dict"""
+    if not _refresh_inventory_cache():
+        return {"items": []}
+    if readonly:
+        return _INV_CACHE['data']
+    # Mutating callers get their own copy so the cache stays intact
+    return copy.deepcopy(_INV_CACHE['data'])
+
+def load_inventory_for_update():
+    """Private copy for a mutating handler, None if the file exists but can't be read"""
+    if _refresh_inventory_cache():
+        return copy.deepcopy(_INV_CACHE['data'])
+    if _stat_inventory()[0] is None:
+        return {"items": []}  # no inventory yet, the first save creates it
+    # Saving on top of an empty list here would wipe the unreadable file
+    return None
+
+def _write_inventory_file(data):
+    with _INV_CACHE['lock']:
+        encoded = _INV_CACHE['encoded'] if _INV_CACHE['data'] is data else None
+    # Same compact JSON as the cached response body, so reuse it when current
+    body = encoded[0] if encoded else _encode_file(data)
+    path = _stat_inventory()[0] or INVENTORY_FILE
+    with _write_lock:
+        atomic_write(path, body)
+        # Keep the other copy in sync for the Kivy app / local fallback
+        other_path = INVENTORY_FILE if path == SHARED_INVENTORY_FILE else SHARED_INVENTORY_FILE
+        if os.path.isdir(os.path.dirname(other_path)):
+            atomic_write(other_path, body)
+    with _INV_CACHE['lock']:
+        # Only claim the new mtime if nothing newer was published meanwhile
+        if _INV_CACHE['data'] is data:
+            _INV_CACHE['mtime'] = os.stat(path).st_mtime_ns
+            _INV_CACHE['dirty'] = False
+
+def _publish_inventory(data):
+    with _INV_CACHE['lock']:
+        _set_cached_inventory(data)
+        _INV_CACHE['dirty'] = True
+
+# Background writer: handlers publish to the cache and return immediately,
+# only the most recent snapshot waiting in the queue gets written. After
+# picking up a snapshot the writer waits SAVE_COALESCE_DELAY so a burst of
+# edits costs one rewrite of the file instead of one per edit.
+SAVE_COALESCE_DELAY = 0.5
+_save_queue = queue.Queue(maxsize=1)
+_save_queue_lock = threading.Lock()
+
+def _inventory_writer():
+    while True:
+        data = _save_queue.get()
+        time.sleep(SAVE_COALESCE_DELAY)
+        try:
+            data = _save_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            _write_inventory_file(data)
+        except Exception:
+            app.logger.exception("Inventory save error")
+
+def enqueue_save(data):
+    _publish_inventory(data)
+    with _save_queue_lock:
+        try:
+            _save_queue.get_nowait()
+        except queue.Empty:
+            pass
+        _save_queue.put_nowait(data)
+
+@atexit.register
+def _flush_pending_save():
+    # The writer may be holding a snapshot mid-delay, so go by the cache
+    if _INV_CACHE['dirty']:
+        _write_inventory_file(_INV_CACHE['data'])
+
+threading.Thread(target=_inventory_writer, daemon=True).start()
+
+def find_item(inventory, item_id):
+    """Look up an item in a loaded inventory without scanning the list"""
+    items = inventory.get('items', [])
+    key = str(item_id)
+    pos = _INV_CACHE['by_id'].get(key)
+    if pos is None:
+        return None
+    if pos < len(items) and str(items[pos].get('id')) == key:
+        return items[pos]
+    # Index is stale (list changed since the last load/save), fall back to a scan
+    for item in items:
+        if str(item.get('id')) == key:
+            return item
+    return None
+
+def next_item_id(inventory):
+    """Allocate an item id from the counter persisted in the inventory"""
+    counter = inventory.get('next_item_id', 1)
+    while find_item(inventory, f"item_{counter}"):
+        counter += 1
+    inventory['next_item_id'] = counter + 1
+    return f"item_{counter}"
+
+def parse_quantity(value):
+    """Quantity from request JSON as a non-negative int, None if it isn't one"""
+    # isdigit() alone also accepts characters like '²' that int() rejects
+    if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    return None
+
+def fast_jsonify(obj):
+    """jsonify() replacement that serializes with orjson when available"""
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+# Inventory changes waiting to be broadcast. Edits arriving within
+# BROADCAST_DELAY of each other go out as a single 'inventory_delta' event.
+BROADCAST_DELAY = 0.05
+_pending_changes = []
+_pending_lock = threading.Lock()
+
+def schedule_broadcast(change):
+    with _pending_lock:
+        _pending_changes.append(change)
+        if len(_pending_changes) > 1:
+            return  # a flush is already armed
+    socketio.start_background_task(_flush_broadcast)
+
+def _flush_broadcast():
+    socketio.sleep(BROADCAST_DELAY)
+    with _pending_lock:
+        changes = list(_pending_changes)
+        _pending_changes.clear()
+    
+    socketio.emit('inventory_delta', changes, to='all')
+    
+    # Category subscribers only get the changes they asked for
+    by_category = {}
+    for change in changes:
+        by_category.setdefault(change.get('category'), []).append(change)
+    for category, category_changes in by_category.items():
+        socketio.emit('inventory_delta', category_changes, to=f'category:{category}')
+
+# Failed logins per (client address, username); past the limit further
+# attempts are refused without checking the password. Keyed on both so a
+# shared address (shop wifi) doesn't lock out everyone behind it.
+LOGIN_MAX_FAILURES = 5
+LOGIN_FAILURE_WINDOW = 60
+# Keys tracked at most; past this the least recently failing are forgotten
+LOGIN_MAX_TRACKED = 10000
+_login_failures = {}
+_login_failures_lock = threading.Lock()
+
+def _login_blocked(key):
+    now = time.monotonic()
+    with _login_failures_lock:
+        recent = [t for t in _login_failures.get(key, ()) if now - t < LOGIN_FAILURE_WINDOW]
+        if recent:
+            _login_failures[key] = recent
+        else:
+            _login_failures.pop(key, None)
+        return len(recent) >= LOGIN_MAX_FAILURES
+
+def _record_login_failure(key):
+    now = time.monotonic()
+    with _login_failures_lock:
+        # Re-inserted so the dict stays ordered by most recent failure
+        times = _login_failures.pop(key, [])
+        times.append(now)
+        # The oldest keys are first: drop the expired ones and anything over
+        # the cap from the front instead of scanning the whole table
+        while _login_failures:
+            stale = next(iter(_login_failures))
+            if (len(_login_failures) < LOGIN_MAX_TRACKED
+                    and now - _login_failures[stale][-1] < LOGIN_FAILURE_WINDOW):
+                break
+            del _login_failures[stale]
+        _login_failures[key] = times[-LOGIN_MAX_FAILURES:]
+
+# Changes on every restart, which is when new templates are picked up
+_STARTUP_TOKEN = secrets.token_hex(8)
+
+# Login decorator
+def login_required(f):
+    # session is bound as a default so each call skips the global lookup
+    @wraps(f)
+    def decorated_function(*args, _session=session, **kwargs):
+        if 'username' not in _session:
+            return redirect(LOGIN_URL)
+        return f(*args, **kwargs)
+    return decorated_function
 
 # Routes
 @app.route('/')
 def index():
     if 'username' not in session:
-        return redirect(url_for('login'))
-    return redirect(url_for('dashboard'))
+        return redirect(LOGIN_URL)
+    return redirect(DASHBOARD_URL)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -60,77 +413,274 @@ def login():
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
         
-        # Simple hardcoded login for testing
-        if username == 'admin' and password == 'admin123':
-            session['username'] = 'admin'
-            session['role'] = 'admin'
-            flash('Login successful!')
-            return redirect(url_for('dashboard'))
-        elif username == 'kika' and password == 'kika123':
-            session['username'] = 'kika'
-            session['role'] = 'owner'
+        throttle_key = (request.remote_addr, username.lower())
+        if _login_blocked(throttle_key):
+            flash('Too many failed attempts, try again in a minute')
+            return render_template('login.html'), 429
+        
+        # Checked against the hashed, mtime-cached users.json
+        ok, user = user_manager.authenticate(username, password)
+        if ok:
+            session.permanent = True
+            session['username'] = user.get('username', username)
+            session['role'] = user.get('role', 'worker')
             flash('Login successful!')
-            return redirect(url_for('dashboard'))
+            return redirect(DASHBOARD_URL)
         else:
+            _record_login_failure(throttle_key)
             flash('Invalid credentials')
     
     return render_template('login.html')
 
 @app.route('/dashboard')
+@login_required
 def dashboard():
-    if 'username' not in session:
-        return redirect(url_for('login'))
+    username = session['username']
+    role = session.get('role', 'worker')
     
-    inventory = load_inventory()
-    total_items = sum(item.get('quantity', 0) for item in inventory.get('items', []))
+    # The page renders only the username (inventory data comes from
+    # /api/inventory), so it only changes with the viewer or a new template,
+    # and templates are only re-read on restart
+    etag = hashlib.blake2b(f"{_STARTUP_TOKEN}:{username}".encode(),
+                           digest_size=8).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     
-    return render_template('dashboard.html',
-                         username=session['username'],
-                         role=session.get('role', 'worker'),
-                         total_items=total_items)
+    response = app.make_response(render_template('dashboard.html',
+                                                  username=username,
+                                                  role=role))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/inventory')
+@login_required
 def inventory_page():
+    data = load_inventory(readonly=True)
+    return render_template('inventory.html', items=data.get('items', []))
+
+@app.route('/api/inventory', methods=['GET'])
+def get_inventory():
     if 'username' not in session:
-        return redirect(url_for('login'))
+        return jsonify({'success': False, 'error': 'Not logged in'})
     
-    data = load_inventory()
-    return render_template('inventory.html', items=data.get('items', []))
+    if not _refresh_inventory_cache():
+        return fast_jsonify({'items': []})
+    
+    body, etag = _INV_CACHE['encoded']
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
 
 @app.route('/api/inventory', methods=['POST'])
 def update_inventory():
     if 'username' not in session:
         return jsonify({'success': False, 'error': 'Not logged in'})
     
-    data = request.json
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Invalid request body'})
     changes = data.get('changes', {})
+    if not isinstance(changes, dict):
+        return jsonify({'success': False, 'error': 'Invalid changes'})
+    quantities = {item_id: parse_quantity(qty) for item_id, qty in changes.items()}
+    if None in quantities.values():
+        return jsonify({'success': False, 'error': 'Quantities must be whole numbers of 0 or more'})
     
     # Update inventory
-    inventory = load_inventory()
-    for item_id, new_qty in changes.items():
-        for item in inventory['items']:
-            if str(item.get('id')) == str(item_id):
+    now_iso = datetime.now().isoformat()
+    with _mutation_lock:
+        inventory = load_inventory_for_update()
+        if inventory is None:
+            return jsonify({'success': False, 'error': 'Inventory file could not be read'})
+        for item_id, new_qty in quantities.items():
+            item = find_item(inventory, item_id)
+            if item:
                 item['quantity'] = new_qty
+                item['last_updated'] = now_iso
+                item['updated_by'] = session['username']
+        
+        enqueue_save(inventory)
     
-    save_inventory(inventory)
+    # Email goes out from a background thread, don't wait on SMTP here
+    email_notifier.send_inventory_change_email_async(
+        quantities,
+        f"{session['username']} ({session.get('role', 'worker')})"
+    )
     
-    # Send email notification
+    return jsonify({'success': True})
+
+@app.route('/api/add_item', methods=['POST'])
+def add_item():
+    if 'username' not in session:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    
+    data = request.json or {}
     try:
-        email_notifier.send_inventory_change_email(
-            changes, 
-            f"{session['username']} ({session.get('role', 'worker')})"
-        )
-    except Exception as e:
-        print(f"Email error: {e}")
+        name = str(data['name']).strip()
+        category = str(data['category']).strip()
+        size = str(data['size']).strip()
+        color = str(data['color']).strip()
+        price = float(data['price'])
+        quantity = parse_quantity(data['quantity'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Missing or invalid item fields'})
     
-    return jsonify({'success': True})
+    # float() also takes 'nan'/'inf', which can't be written as JSON
+    if (not (name and category and size and color) or quantity is None
+            or not math.isfinite(price) or price < 0):
+        return jsonify({'success': False, 'error': 'Missing or invalid item fields'})
+    
+    with _mutation_lock:
+        inventory = load_inventory_for_update()
+        if inventory is None:
+            return jsonify({'success': False, 'error': 'Inventory file could not be read'})
+        new_item = {
+            'id': next_item_id(inventory),
+            'name': name,
+            'category': category,
+            'size': size,
+            'color': color,
+            'price': price,
+            'quantity': quantity,
+            'last_updated': datetime.now().isoformat(),
+            'updated_by': session['username']
+        }
+        inventory.setdefault('items', []).append(new_item)
+        enqueue_save(inventory)
+    
+    return jsonify({'success': True, 'item': new_item})
+
+@app.route('/api/update_quantity', methods=['POST'])
+@login_required
+def update_quantity():
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Invalid request body'})
+    item_id = data.get('item_id')
+    new_quantity = parse_quantity(data.get('quantity'))
+    if new_quantity is None:
+        return jsonify({'success': False, 'error': 'Quantity must be a whole number of 0 or more'})
+    
+    with _mutation_lock:
+        inventory = load_inventory_for_update()
+        if inventory is None:
+            return jsonify({'success': False, 'error': 'Inventory file could not be read'})
+        item = find_item(inventory, item_id)
+        if not item:
+            return jsonify({'success': False, 'error': 'Item not found'})
+        
+        old_quantity = item.get('quantity', 0)
+        item['quantity'] = new_quantity
+        item['last_updated'] = datetime.now().isoformat()
+        item['updated_by'] = session['username']
+        enqueue_save(inventory)
+    
+    # Notify via SocketIO
+    schedule_broadcast({
+        'op': 'update',
+        'id': item['id'],
+        'category': item.get('category'),
+        'fields': {
+            'quantity': item['quantity'],
+            'last_updated': item['last_updated'],
+            'updated_by': item['updated_by']
+        }
+    })
+    email_notifier.send_inventory_change_email_async(
+        {item['id']: item['quantity']},
+        f"{session['username']} ({session.get('role', 'worker')})"
+    )
+    return jsonify({'success': True, 'old_quantity': old_quantity})
+
+@app.route('/api/messages')
+@login_required
+def get_messages():
+    # Shared copy first; a missing file is found out by the read itself
+    for messages_path in (SHARED_MESSAGES_FILE, MESSAGES_FILE):
+        try:
+            return fast_jsonify(load_json(messages_path))
+        except FileNotFoundError:
+            continue
+        except Exception:
+            break
+    return jsonify([])
+
+@app.route('/api/send_message', methods=['POST'])
+@login_required
+def send_message():
+    try:
+        data = request.json or {}
+        message = data.get('message', '').strip()
+        
+        if not message:
+            return jsonify({'success': False, 'error': 'Message cannot be empty'})
+        
+        msg_data = {
+            'sender': session['username'],
+            'message': message,
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        try:
+            messages = list(load_json(MESSAGES_FILE))
+        except Exception:
+            messages = []
+        
+        messages.append(msg_data)
+        
+        body = _encode_file(messages)
+        _write_json_file(MESSAGES_FILE, messages, body)
+        
+        # Also save to shared location
+        if os.path.exists(os.path.dirname(SHARED_MESSAGES_FILE)):
+            _write_json_file(SHARED_MESSAGES_FILE, messages, body)
+        
+        # Broadcast via SocketIO
+        socketio.emit('new_message', msg_data)
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/logout')
 def logout():
     session.clear()
     flash('Logged out successfully')
-    return redirect(url_for('login'))
+    return redirect(LOGIN_URL)
+
+# SocketIO events
+@socketio.on('connect')
+def handle_connect():
+    join_room('all')
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    # Narrow this client's inventory deltas down to the given categories.
+    # Anything but a list of names is ignored, so a malformed request can't
+    # take the client out of 'all'.
+    if not isinstance(data, dict):
+        return
+    categories = data.get('categories')
+    if not isinstance(categories, list) or not all(isinstance(c, str) for c in categories):
+        return
+    if categories:
+        leave_room('all')
+        for category in categories:
+            join_room(f'category:{category}')
+
+# Redirect targets, built once instead of walking the URL map per redirect
+with app.test_request_context():
+    LOGIN_URL = url_for('login')
+    DASHBOARD_URL = url_for('dashboard')
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port)
+    socketio.run(app, host='0.0.0.0', port=port)
@@ -1,68 +1,166 @@
 import json
 import hashlib
+import hmac
 import secrets
 import os
 from datetime import datetime
+from types import MappingProxyType
+
+try:
+    from storage import atomic_write
+except ImportError:
+    # Imported as web_app.auth by wsgi.py
+    from web_app.storage import atomic_write
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# argon2-cffi hashes in C; without it we keep the old salted SHA-256 scheme
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHash
+    _password_hasher = PasswordHasher()
+except ImportError:
+    _password_hasher = None
+
+# Under eventlet a hash computed on a greenlet stalls every other request,
+# so hashing runs on eventlet's native thread pool when it's available
+try:
+    from eventlet import tpool
+    _offload = tpool.execute
+except ImportError:
+    def _offload(func, *args):
+        return func(*args)
 
 class UserManager:
     def __init__(self, users_file='users.json'):
         self.users_file = users_file
-        self.users = self.load_users()
+        # Nothing is parsed until the first lookup; -1 never matches a real
+        # mtime (or the None of a missing file) so that lookup loads the file
+        self._mtime = -1
+        self._set_users({})
+    
+    def _set_users(self, users):
+        self.users = users
+        # Lowercased username -> key in self.users, for case-insensitive login
+        self._users_lower = {u.lower(): u for u in users}
+        self._workers = None
+    
+    def _file_mtime(self):
+        try:
+            return os.stat(self.users_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _reload_if_changed(self):
+        # Pick up edits made to users.json outside this process
+        mtime = self._file_mtime()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._set_users(self.load_users())
     
     def load_users(self):
         try:
-            if os.path.exists(self.users_file):
-                with open(self.users_file, 'r') as f:
-                    return json.load(f)
+            with open(self.users_file, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson else json.loads(raw)
         except Exception:
-            pass
-        return {}
+            return {}
     
     def save_users(self):
         try:
-            with open(self.users_file, 'w') as f:
-                json.dump(self.users, f, indent=2)
+            if orjson:
+                body = orjson.dumps(self.users, option=orjson.OPT_INDENT_2)
+            else:
+                body = json.dumps(self.users, indent=2).encode()
+            # Holds password hashes, so a new file is readable by the owner only
+            atomic_write(self.users_file, body, new_file_mode=0o600)
+            self._mtime = self._file_mtime()
+            self._workers = None
             return True
         except Exception:
             return False
     
     def hash_password(self, password):
+        if _password_hasher:
+            return _password_hasher.hash(password)
         salt = secrets.token_hex(16)
         hashed = hashlib.sha256((password + salt).encode()).hexdigest()
         return f"{salt}${hashed}"
     
     def verify_password(self, stored, provided):
-        if not stored or '$' not in stored:
+        if not stored:
             return False
-        salt, hashed = stored.split('$')
-        test = hashlib.sha256((provided + salt).encode()).hexdigest()
-        return test == hashed
+        if stored.startswith('$argon2'):
+            if not _password_hasher:
+                return False
+            try:
+                return _password_hasher.verify(stored, provided)
+            except (VerificationError, InvalidHash):
+                return False
+        salt, sep, hashed = stored.partition('$')
+        if not sep:
+            return False
+        try:
+            expected = bytes.fromhex(hashed)
+        except ValueError:
+            return False
+        h = hashlib.sha256(provided.encode())
+        h.update(salt.encode())
+        return hmac.compare_digest(h.digest(), expected)
+    
+    def needs_rehash(self, stored):
+        if not _password_hasher:
+            return False
+        if not stored.startswith('$argon2'):
+            return True
+        return _password_hasher.check_needs_rehash(stored)
+    
+    def get_user(self, username):
+        self._reload_if_changed()
+        key = self._users_lower.get(username.lower())
+        return self.users.get(key) if key else None
     
     def authenticate(self, username, password):
-        if username not in self.users:
+        user = self.get_user(username)
+        if user is None:
             return False, None
         
-        user = self.users[username]
-        if self.verify_password(user.get('password_hash', ''), password):
+        stored = user.get('password_hash', '')
+        if _offload(self.verify_password, stored, password):
+            # Upgrade legacy SHA-256 (or outdated argon2) hashes on login
+            if self.needs_rehash(stored):
+                user['password_hash'] = _offload(self.hash_password, password)
+                self.save_users()
             return True, user
         
         return False, None
     
     def add_worker(self, username, email, full_name):
-        if username in self.users:
+        self._reload_if_changed()
+        if username.lower() in self._users_lower:
             return False, "Username exists"
         
         temp_pass = secrets.token_urlsafe(8)
         self.users[username] = {
             "username": username,
-            "password_hash": self.hash_password(temp_pass),
+            "password_hash": _offload(self.hash_password, temp_pass),
             "role": "worker",
             "email": email,
             "full_name": full_name,
             "created_at": datetime.now().isoformat()
         }
+        self._users_lower[username.lower()] = username
         self.save_users()
         return True, temp_pass
     
     def get_all_workers(self):
-        return {u: d for u, d in self.users.items() if d.get('role') == 'worker'}
+        # Shared between callers until users.json changes, handed out as a
+        # read-only view so one caller can't alter what the next one sees
+        self._reload_if_changed()
+        if self._workers is None:
+            self._workers = MappingProxyType(
+                {u: d for u, d in self.users.items() if d.get('role') == 'worker'})
+        return self._workers
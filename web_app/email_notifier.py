@@ -1,20 +1,58 @@
 import smtplib
 import json
-import os
+import atexit
+import queue
+import string
+import threading
+import logging
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Providers throttle or cut sessions that carry too many messages, so a
+# session is replaced after this many (overridable in email_config.json)
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+# Email bodies, filled in with substitute() at send time
+INVENTORY_CHANGE_BODY = string.Template(
+    "Changes:\n$changes\nBy: $user\nTime: $time")
+PASSWORD_RESET_BODY = string.Template(
+    "Hello $name,\n\nYour temporary password is: $temp_pass\n"
+    "Please change it after logging in.")
+
+# Inventory changes arriving within this many seconds share one email
+CHANGE_BATCH_DELAY = 0.2
+
 class EmailNotifier:
     def __init__(self, config_file='email_config.json'):
         self.config_file = config_file
-        self.config = self.load_config()
+        # Read on first use, not at import time
+        self._config = None
+        # Sends queued by request handlers, drained by a background thread
+        self._queue = queue.Queue(maxsize=1024)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        # Inventory changes waiting for the batch timer
+        self._pending_changes = {}
+        self._pending_users = {}
+        self._pending_timer = None
+        self._pending_lock = threading.Lock()
+        # SMTP session reused across sends, only touched by the worker thread
+        self._smtp = None
+        self._smtp_sent = 0
+        atexit.register(self.close)
+    
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
     
     def load_config(self):
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
         except Exception:
             pass
         return {
@@ -27,26 +65,115 @@ class EmailNotifier:
             "enabled": False
         }
     
-    def send_inventory_change_email(self, changes, user_making_change):
-        if not self.config.get('enabled', False):
+    def _get_smtp(self):
+        max_messages = self.config.get('smtp_max_messages_per_connection',
+                                       SMTP_MAX_MESSAGES_PER_CONNECTION)
+        if self._smtp is not None and self._smtp_sent >= max_messages:
+            self.close()
+        # Servers drop idle sessions, so check the kept one with NOOP first
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+        try:
+            server.starttls()
+            server.login(self.config['sender_email'], self.config['sender_password'])
+        except BaseException:
+            server.close()
+            raise
+        self._smtp = server
+        self._smtp_sent = 0
+        return server
+    
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+    
+    def send_email(self, recipients, subject, body):
+        sender = self.config.get('sender_email')
+        if not sender or not recipients:
+            # Body left out of the log, it can hold a temporary password
+            logger.info("Email not configured, would send: %s", subject)
             return True
-        
         try:
-            subject = "Inventory Changes"
-            body = f"Changes: {changes}\nBy: {user_making_change}\nTime: {datetime.now()}"
-            
-            # This is a stub - will work when email is configured
-            print(f"Would send email: {subject}\n{body}")
+            # One message addressed to everyone, a single SMTP transaction
+            msg = MIMEText(body, 'plain')
+            msg['From'] = sender
+            msg['To'] = ', '.join(recipients)
+            msg['Subject'] = subject
+            server = self._get_smtp()
+            server.send_message(msg, to_addrs=recipients)
+            self._smtp_sent += 1
             return True
-        except Exception:
+        except (smtplib.SMTPException, OSError):
+            logger.exception("Email error")
+            self.close()
+            return False
+    
+    def _run_worker(self):
+        while True:
+            send, args = self._queue.get()
+            try:
+                send(*args)
+            except Exception:
+                logger.exception("Email error")
+    
+    def _enqueue(self, send, *args):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, daemon=True)
+                self._worker.start()
+        try:
+            self._queue.put_nowait((send, args))
             return True
+        except queue.Full:
+            logger.warning("Email queue full, dropping notification")
+            return False
     
-    def send_password_reset_email(self, email, name, temp_pass):
+    def send_inventory_change_email_async(self, changes, user_making_change):
         if not self.config.get('enabled', False):
             return True
-        
-        try:
-            print(f"Would send password email to {email}: {temp_pass}")
+        with self._pending_lock:
+            # Later changes to the same item win, users keep arrival order
+            self._pending_changes.update(changes)
+            self._pending_users[user_making_change] = None
+            if self._pending_timer is None:
+                self._pending_timer = threading.Timer(CHANGE_BATCH_DELAY, self._flush_pending_changes)
+                self._pending_timer.daemon = True
+                self._pending_timer.start()
+        return True
+    
+    def _flush_pending_changes(self):
+        with self._pending_lock:
+            changes, self._pending_changes = self._pending_changes, {}
+            users, self._pending_users = self._pending_users, {}
+            self._pending_timer = None
+        if changes:
+            self._enqueue(self.send_inventory_change_email, changes, ', '.join(users))
+    
+    def send_inventory_change_email(self, changes, user_making_change):
+        if not self.config.get('enabled', False):
             return True
-        except Exception:
+        
+        subject = "Inventory Changes"
+        change_lines = '\n'.join(f"  {item_id}: new quantity {qty}" for item_id, qty in changes.items())
+        body = INVENTORY_CHANGE_BODY.substitute(changes=change_lines, user=user_making_change,
+                                                time=datetime.now())
+        recipients = [r for r in (self.config.get('admin_email'), self.config.get('owner_email')) if r]
+        return self.send_email(recipients, subject, body)
+    
+    def send_password_reset_email(self, email, name, temp_pass):
+        if not self.config.get('enabled', False):
             return True
+        
+        subject = "Your Kika's Shop account"
+        body = PASSWORD_RESET_BODY.substitute(name=name, temp_pass=temp_pass)
+        return self.send_email([email] if email else [], subject, body)
@@ -21,15 +21,30 @@ function initSocket() {
         console.log('Connected to server');
     });
     
-    socket.on('inventory_update', function(inventory) {
-        console.log('Inventory updated via socket');
-        currentInventory = inventory.items || [];
+    // Deltas sent while disconnected are lost, resync the full list once
+    socket.io.on('reconnect', function() {
+        loadInventory();
+    });
+    
+    socket.on('inventory_delta', function(changes) {
+        console.log('Inventory delta via socket');
+        applyInventoryDelta(changes);
         renderInventory();
         updateAnalytics();
         updateCharts();
     });
 }
 
+// Merge batched item changes into the local copy
+function applyInventoryDelta(changes) {
+    changes.forEach(change => {
+        const item = currentInventory.find(i => i.id === change.id);
+        if (item && change.op === 'update') {
+            Object.assign(item, change.fields);
+        }
+    });
+}
+
 // Load inventory from server
 function loadInventory() {
     fetch('/api/inventory')
@@ -0,0 +1,26 @@
+import os
+import stat
+import tempfile
+
+def atomic_write(path, body, new_file_mode=0o644):
+    """Write to a temp file and swap it in so readers never see a partial file
+
+    An existing file keeps its permissions, a new one gets new_file_mode.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = new_file_mode
+    # Unique temp name so concurrent writers of the same file can't collide
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+            # Data must be on disk before the rename makes it visible
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)  # mkstemp always creates 0600
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
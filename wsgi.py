@@ -1,5 +1,6 @@
 # wsgi.py - Entry point for Render
-from web_app.app import app
+from web_app.app import app, socketio
 
 if __name__ == "__main__":
-    app.run()
+    import os
+    socketio.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))